@@ -20,6 +20,18 @@ from .regression import RegressionDetector
 from .git_manager import GitWorkflowManager
 
 
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data to a sibling temp file and atomically swap it into place."""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
 class RefactorAgent:
     """Main agent orchestrating microservice refactoring."""
     
@@ -228,8 +240,11 @@ class RefactorAgent:
         # 3. Write the changes back
         # 4. Return the list of changes made
         
+        # Plans unioned from several sources can repeat target files
+        target_files = list(dict.fromkeys(fp for fp in step.target_files if fp))
+
         # For now, simulate some changes
-        for file_path in step.target_files[:3]:  # Limit for simulation
+        for file_path in target_files[:3]:  # Limit for simulation
             if not dry_run:
                 # Would actually modify files here
                 pass
@@ -239,7 +254,9 @@ class RefactorAgent:
                 change_type="modify",
                 diff=f"--- a/{file_path}\n+++ b/{file_path}\n@@ -1,3 +1,3 @@\n-old code\n+new refactored code\n",
                 line_changes={"added": 10, "removed": 5},
-                semantic_changes=[f"Refactored according to {step.type.value}"]
+                semantic_changes=[f"Refactored according to {step.type.value}"],
+                added_lines=["new refactored code"],
+                removed_lines=["old code"]
             ))
         
         return changes
@@ -300,8 +317,10 @@ class RefactorAgent:
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         output_file = output_dir / f"analysis-{timestamp}.json"
         
-        with open(output_file, 'w') as f:
-            json.dump(analysis.dict(), f, indent=2, default=str)
+        _atomic_write_bytes(
+            output_file,
+            json.dumps(analysis.dict(), indent=2, default=str).encode('utf-8')
+        )
         
         self.logger.info(f"Analysis saved to {output_file}")
     
@@ -312,8 +331,10 @@ class RefactorAgent:
         
         output_file = output_dir / f"plan-{plan.id}.json"
         
-        with open(output_file, 'w') as f:
-            json.dump(plan.dict(), f, indent=2, default=str)
+        _atomic_write_bytes(
+            output_file,
+            json.dumps(plan.dict(), indent=2, default=str).encode('utf-8')
+        )
         
         self.logger.info(f"Plan saved to {output_file}")
     
@@ -327,8 +348,10 @@ class RefactorAgent:
         
         results_data = [r.dict() for r in results]
         
-        with open(output_file, 'w') as f:
-            json.dump(results_data, f, indent=2, default=str)
+        _atomic_write_bytes(
+            output_file,
+            json.dumps(results_data, indent=2, default=str).encode('utf-8')
+        )
         
         self.logger.info(f"Results saved to {output_file}")
     
@@ -339,8 +362,7 @@ class RefactorAgent:
         
         output_file = output_dir / f"pr-{plan_id}.md"
         
-        with open(output_file, 'w') as f:
-            f.write(description)
+        _atomic_write_bytes(output_file, description.encode('utf-8'))
         
         self.logger.info(f"PR description saved to {output_file}")
     
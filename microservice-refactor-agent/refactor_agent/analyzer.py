@@ -353,19 +353,26 @@ class ArchitectureAnalyzer:
     def _calculate_metrics(self, services: Dict[str, Dict[str, Any]], 
                           dependencies: List[ServiceDependency]) -> Dict[str, float]:
         """Calculate architecture metrics."""
+        service_count = len(services)
+        total_complexity = 0
+        total_endpoints = 0
+        for service in services.values():
+            total_complexity += service["complexity"]
+            total_endpoints += len(service["api_endpoints"])
+        
         metrics = {
-            "total_services": len(services),
+            "total_services": service_count,
             "total_dependencies": len(dependencies),
-            "avg_service_complexity": sum(s["complexity"] for s in services.values()) / max(len(services), 1),
-            "coupling_score": len(dependencies) / max(len(services) * (len(services) - 1), 1),
-            "avg_endpoints_per_service": sum(len(s["api_endpoints"]) for s in services.values()) / max(len(services), 1)
+            "avg_service_complexity": total_complexity / max(service_count, 1),
+            "coupling_score": len(dependencies) / max(service_count * (service_count - 1), 1),
+            "avg_endpoints_per_service": total_endpoints / max(service_count, 1)
         }
         
         # Calculate centrality metrics if we have dependencies
         if self.dependency_graph.number_of_nodes() > 0:
-            centrality = nx.degree_centrality(self.dependency_graph)
-            metrics["max_centrality"] = max(centrality.values()) if centrality else 0
-            metrics["avg_centrality"] = sum(centrality.values()) / len(centrality) if centrality else 0
+            centrality = list(nx.degree_centrality(self.dependency_graph).values())
+            metrics["max_centrality"] = max(centrality) if centrality else 0
+            metrics["avg_centrality"] = sum(centrality) / len(centrality) if centrality else 0
         
         return metrics
     
@@ -1,8 +1,9 @@
 """Data models for the refactor agent."""
 
-from typing import List, Dict, Optional, Set, Any
+import sys
+from typing import List, Dict, Optional, Set, Any, Tuple
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 
 
@@ -90,7 +91,13 @@ class RegressionRisk(BaseModel):
     description: str
     affected_components: List[str]
     mitigation: Optional[str] = None
-    test_suggestions: List[str] = []
+    test_suggestions: Tuple[str, ...] = ()
+
+    @field_validator("type", "description")
+    @classmethod
+    def _intern_key_fields(cls, value: str) -> str:
+        """Intern fields used as deduplication keys so hashing compares pointers."""
+        return sys.intern(value)
 
 
 class CodeChange(BaseModel):
@@ -100,6 +107,10 @@ class CodeChange(BaseModel):
     diff: str
     line_changes: Dict[str, int]  # {'added': n, 'removed': m}
     semantic_changes: List[str]  # High-level description of changes
+    added_lines: List[str] = []  # '+' lines without the prefix, filled by diff producers
+    removed_lines: List[str] = []  # '-' lines without the prefix, filled by diff producers
+    old_content: Optional[str] = None  # Full file before the change, when available
+    new_content: Optional[str] = None  # Full file after the change, when available
 
 
 class CommitInfo(BaseModel):
@@ -2,9 +2,16 @@
 
 import re
 import ast
-from typing import List, Dict, Any, Set, Tuple, Optional
+import io
+import hashlib
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Set, Tuple, Optional, Type
 from difflib import unified_diff
 import json
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 
 from .models import (
     RegressionRisk,
@@ -13,25 +20,402 @@ from .models import (
 )
 
 
+# Bit flags recording which trigger keywords appear on a diff line
+_CONDITION = 1 << 0
+_LOOP = 1 << 1
+_RETURN = 1 << 2
+_EXCEPTION = 1 << 3
+_DB_QUERY = 1 << 4
+_AUTH = 1 << 5
+_ASYNC = 1 << 6
+_SYNC_IO = 1 << 7
+
+# Statement keywords only count at the start of a line, so inline uses such as
+# `x if y else z` or comprehension `for` clauses do not register
+_COND_PREFIXES = ('if ', 'elif ', 'while ', 'for ')
+_LOOP_PREFIXES = ('for ', 'while ')
+_RET_PREFIXES = ('return ',)
+_EXC_PREFIXES = ('try:', 'except ', 'raise ')
+
+# Clause headers that may carry a statement on the same line, as in `if x: return y`
+_COMPOUND_PREFIXES = ('if ', 'elif ', 'else:', 'for ', 'while ', 'try:', 'except', 'finally:', 'with ')
+
+# Single-line function signature, used when full file contents are unavailable
+_FUNC_DEF_RE = re.compile(r'def\s+(\w+)\s*\(([^)]*)\)')
+
+_INTERFACE_KEYWORDS = ('class ', 'interface ', 'trait ')
+
+_ASYNC_TOKENS = ('async ',)
+_SYNC_IO_TOKENS = ('open(', 'requests.', 'urllib.')
+
+_PREFIX_TRIGGERS = (
+    (_CONDITION, _COND_PREFIXES),
+    (_LOOP, _LOOP_PREFIXES),
+    (_RETURN, _RET_PREFIXES),
+    (_EXCEPTION, _EXC_PREFIXES),
+)
+
+# Each remaining keyword family is compiled into one literal alternation so a
+# line is tested per family by a single C-level regex scan
+_SUBSTRING_TRIGGERS = tuple(
+    (flag, re.compile('|'.join(re.escape(kw) for kw in keywords)))
+    for flag, keywords in (
+        (_DB_QUERY, ('SELECT', 'INSERT', 'UPDATE', 'DELETE', '.query(', '.filter(', '.all()', '.first()')),
+        (_AUTH, ('@login_required', '@requires_auth', 'check_permission', 'authenticate')),
+        (_ASYNC, _ASYNC_TOKENS),
+        (_SYNC_IO, _SYNC_IO_TOKENS),
+    )
+)
+
+
+def _statement_flags(statement: str) -> int:
+    """Return the prefix trigger flags for a left-stripped line."""
+    # `async for` / `async with` are the same statements as their plain forms
+    if statement.startswith('async '):
+        statement = statement[6:].lstrip()
+    
+    flags = 0
+    for flag, prefixes in _PREFIX_TRIGGERS:
+        if statement.startswith(prefixes):
+            flags |= flag
+    
+    # Classify a statement that shares the line with its clause header
+    if statement.startswith(_COMPOUND_PREFIXES):
+        _, sep, body = statement.partition(': ')
+        body = body.lstrip()
+        if sep and body:
+            flags |= _statement_flags(body)
+    return flags
+
+
+@dataclass
+class _DiffSide:
+    """One side of a diff: its lines plus per-trigger counts, filled in a single pass."""
+    lines: List[str] = field(default_factory=list)
+    returns: List[str] = field(default_factory=list)
+    flag_counts: Dict[int, int] = field(default_factory=dict)
+    
+    def add(self, line: str) -> None:
+        self.lines.append(line)
+        flags = _statement_flags(line.lstrip())
+        if flags:
+            for flag, _ in _PREFIX_TRIGGERS:
+                if flags & flag:
+                    self.flag_counts[flag] = self.flag_counts.get(flag, 0) + 1
+            if flags & _RETURN:
+                self.returns.append(line)
+        for flag, pattern in _SUBSTRING_TRIGGERS:
+            if pattern.search(line):
+                self.flag_counts[flag] = self.flag_counts.get(flag, 0) + 1
+    
+    def count(self, flag: int) -> int:
+        return self.flag_counts.get(flag, 0)
+
+
+class _LRUCache(OrderedDict):
+    """Mapping that keeps only the maxsize most recently used entries."""
+    
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+    
+    def put(self, key: Any, value: Any) -> None:
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+# Constant fields of every risk the detector can raise; _make_risk fills in the rest
+_RISK_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "api_endpoint_removed": {
+        "type": "api_change",
+        "severity": "critical",
+        "mitigation": "Add deprecation notice and migration path",
+        "test_suggestions": (
+            "Test all client applications",
+            "Verify API backward compatibility",
+            "Check API documentation updates",
+        ),
+    },
+    "api_endpoint_modified": {
+        "type": "api_change",
+        "severity": "high",
+        "mitigation": "Ensure backward compatibility or version the API",
+        "test_suggestions": (
+            "Test with existing API clients",
+            "Verify request/response format compatibility",
+            "Update API tests",
+        ),
+    },
+    "api_parameters_changed": {
+        "type": "api_change",
+        "mitigation": "Update all callers or maintain backward compatibility",
+    },
+    "control_flow_modified": {
+        "type": "behavior_change",
+        "severity": "high",
+        "description": "Control flow logic modified",
+        "mitigation": "Ensure all edge cases are covered",
+        "test_suggestions": (
+            "Test all conditional branches",
+            "Verify edge cases",
+            "Check boundary conditions",
+        ),
+    },
+    "return_values_modified": {
+        "type": "behavior_change",
+        "severity": "high",
+        "description": "Return values modified",
+        "mitigation": "Verify all callers handle new return values",
+        "test_suggestions": (
+            "Test return value compatibility",
+            "Check error handling",
+            "Verify type consistency",
+        ),
+    },
+    "exception_handling_modified": {
+        "type": "behavior_change",
+        "severity": "medium",
+        "description": "Exception handling modified",
+        "mitigation": "Ensure error handling remains robust",
+        "test_suggestions": (
+            "Test error scenarios",
+            "Verify exception propagation",
+            "Check error messages",
+        ),
+    },
+    "loops_added": {
+        "type": "performance",
+        "severity": "medium",
+        "description": "Additional loops added, potential performance impact",
+        "mitigation": "Profile code and optimize if necessary",
+        "test_suggestions": (
+            "Run performance benchmarks",
+            "Test with large datasets",
+            "Monitor resource usage",
+        ),
+    },
+    "db_queries_added": {
+        "type": "performance",
+        "severity": "high",
+        "description": "Additional database queries detected",
+        "mitigation": "Consider query optimization or caching",
+        "test_suggestions": (
+            "Profile database queries",
+            "Check for N+1 query problems",
+            "Test query performance",
+        ),
+    },
+    "sync_io_in_async": {
+        "type": "performance",
+        "severity": "high",
+        "description": "Synchronous I/O in async function",
+        "mitigation": "Use async I/O libraries",
+        "test_suggestions": (
+            "Test async performance",
+            "Check for blocking operations",
+            "Monitor event loop",
+        ),
+    },
+    "sql_injection": {
+        "type": "security",
+        "severity": "critical",
+        "description": "Potential SQL injection vulnerability",
+        "mitigation": "Use parameterized queries",
+        "test_suggestions": (
+            "Test with malicious input",
+            "Run security scanning tools",
+            "Review query construction",
+        ),
+    },
+    "auth_removed": {
+        "type": "security",
+        "severity": "critical",
+        "description": "Authentication/authorization checks removed",
+        "mitigation": "Ensure proper access controls remain in place",
+        "test_suggestions": (
+            "Test unauthorized access attempts",
+            "Verify permission checks",
+            "Audit access logs",
+        ),
+    },
+    "hardcoded_secrets": {
+        "type": "security",
+        "severity": "critical",
+        "description": "Hardcoded secrets detected",
+        "mitigation": "Use environment variables or secret management service",
+        "test_suggestions": (
+            "Scan for exposed secrets",
+            "Verify secret rotation",
+            "Check environment configuration",
+        ),
+    },
+    "new_dependencies": {
+        "type": "behavior_change",
+        "severity": "low",
+        "description": "New dependencies introduced",
+        "mitigation": "Verify dependency compatibility and security",
+        "test_suggestions": (
+            "Check dependency versions",
+            "Run security audit",
+            "Test in isolated environment",
+        ),
+    },
+    "file_renamed": {
+        "type": "api_change",
+        "severity": "medium",
+        "mitigation": "Update all imports and references",
+        "test_suggestions": (
+            "Verify all imports are updated",
+            "Check configuration files",
+            "Test module loading",
+        ),
+    },
+    "interfaces_modified": {
+        "type": "behavior_change",
+        "severity": "high",
+        "description": "Multiple interfaces modified simultaneously",
+        "mitigation": "Ensure all implementations are updated consistently",
+        "test_suggestions": (
+            "Run integration tests",
+            "Verify interface contracts",
+            "Check for version mismatches",
+        ),
+    },
+    "many_files_changed": {
+        "type": "behavior_change",
+        "severity": "medium",
+        "description": "Large number of files changed",
+        "mitigation": "Consider breaking into smaller, incremental changes",
+        "test_suggestions": (
+            "Run comprehensive test suite",
+            "Perform staged rollout",
+            "Monitor system behavior closely",
+        ),
+    },
+}
+
+
+def _make_risk(template: str, **fields: Any) -> RegressionRisk:
+    """Build a risk from a template, overriding or adding the given fields."""
+    return RegressionRisk(**{**_RISK_TEMPLATES[template], **fields})
+
+
+# Order in which severities are listed in reports
+_SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+# Weights combined by RegressionDetector._risk_priority (severity dominates type)
+_SEVERITY_SCORES = {
+    "critical": 4,
+    "high": 3,
+    "medium": 2,
+    "low": 1
+}
+
+_RISK_TYPE_SCORES = {
+    "security": 4,
+    "api_change": 3,
+    "behavior_change": 2,
+    "performance": 1
+}
+
+# Endpoint declaration pattern for each supported route style
+_API_ROUTE_STYLES = {
+    "flask_route": r'@app\.route\s*\([\'"](?:[^\'"]+)[\'"]\)',
+    "fastapi_route": r'@(?:app|router)\.(?:get|post|put|delete|patch)\s*\([\'"](?:[^\'"]+)[\'"]\)',
+    "django_url": r'path\s*\([\'"](?:[^\'"]+)[\'"]',
+    "express_route": r'(?:app|router)\.(?:get|post|put|delete|patch)\s*\([\'"](?:[^\'"]+)[\'"]',
+}
+
+
+def _compile_api_patterns() -> Tuple[re.Pattern, Dict[str, re.Pattern]]:
+    """Compile one alternation that screens lines for any route style, plus a pattern per style."""
+    screen = re.compile('|'.join(f'(?P<{style}>{pattern})' for style, pattern in _API_ROUTE_STYLES.items()))
+    styles = {style: re.compile(pattern) for style, pattern in _API_ROUTE_STYLES.items()}
+    return screen, styles
+
+
+def _compile_security_patterns() -> Tuple[re.Pattern, re.Pattern]:
+    """Compile the SQL injection and hardcoded secret alternations."""
+    sql_injection = re.compile(
+        r'\.format\s*\(.*\).*(?:SELECT|INSERT|UPDATE|DELETE)'
+        r'|%\s*\(.*\).*(?:SELECT|INSERT|UPDATE|DELETE)'
+        r'|\+.*(?:SELECT|INSERT|UPDATE|DELETE)',
+        re.IGNORECASE
+    )
+    secret = re.compile(
+        r'(?:password|secret|key|token)\s*=\s*["\'][^"\']+["\']'
+        r'|(?:AWS|AZURE|GCP)_[A-Z_]+\s*=\s*["\'][^"\']+["\']',
+        re.IGNORECASE
+    )
+    return sql_injection, secret
+
+
+def _compile_behavior_patterns() -> Dict[str, re.Pattern]:
+    """Compile regex patterns for behavior detection."""
+    return {
+        "function_def": _FUNC_DEF_RE,
+        "class_def": re.compile(r'class\s+(\w+)'),
+        "conditional": re.compile(r'(if|elif|while|for)\s+'),
+        "exception": re.compile(r'(try:|except\s+|raise\s+)'),
+        "return": re.compile(r'return\s+'),
+    }
+
+
+# Patterns are compiled once at import and shared by every detector instance
+_API_PATTERN, _API_STYLE_PATTERNS = _compile_api_patterns()
+_BEHAVIOR_PATTERNS = _compile_behavior_patterns()
+_SQL_INJECTION_PATTERN, _SECRET_PATTERN = _compile_security_patterns()
+
+
 class RegressionDetector:
     """Detects potential regressions in code changes."""
     
-    def __init__(self):
-        self.api_patterns = self._compile_api_patterns()
-        self.behavior_patterns = self._compile_behavior_patterns()
-        
-    def analyze_changes(self, changes: List[CodeChange], context: Dict[str, Any]) -> List[RegressionRisk]:
-        """Analyze code changes for potential regressions."""
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 64,
+        cache_size: int = 4096
+    ):
+        # Change sets larger than parallel_threshold are analyzed in a process pool.
+        # A fresh pool is started for each such analyze_changes call, so the
+        # threshold should stay well above the point where worker start-up and
+        # pickling outweigh the per-change analysis it saves.
+        self.max_workers = max_workers or os.cpu_count()
+        self.parallel_threshold = parallel_threshold
+        self.api_pattern = _API_PATTERN
+        self.behavior_patterns = _BEHAVIOR_PATTERNS
+        self.sql_injection_pattern = _SQL_INJECTION_PATTERN
+        self.secret_pattern = _SECRET_PATTERN
+        # Results for the cache_size most recently analyzed changes
+        self._risk_cache = _LRUCache(cache_size)
+        # Signatures per file version, keyed by content hash; None for unparseable source
+        self._signature_cache = _LRUCache(cache_size)
+        
+    def analyze_changes(
+        self,
+        changes: List[CodeChange],
+        context: Dict[str, Any],
+        top_k: Optional[int] = None
+    ) -> List[RegressionRisk]:
+        """Analyze code changes for potential regressions.
+        
+        When top_k is given, only the top_k highest-priority risks are returned.
+        """
         risks = []
         
+        if len(changes) > self.parallel_threshold:
+            self._analyze_in_pool(changes)
+        
         for change in changes:
-            # Analyze different types of changes
-            if change.change_type in ["modify", "delete"]:
-                risks.extend(self._analyze_modification(change, context))
-            elif change.change_type == "add":
-                risks.extend(self._analyze_addition(change, context))
-            elif change.change_type == "rename":
-                risks.extend(self._analyze_rename(change, context))
+            risks.extend(self._analyze_change(change, context))
         
         # Analyze cross-file impacts
         risks.extend(self._analyze_cross_file_impacts(changes, context))
@@ -39,337 +423,377 @@ class RegressionDetector:
         # Deduplicate and prioritize risks
         risks = self._deduplicate_risks(risks)
         
-        return sorted(risks, key=lambda r: self._risk_priority(r), reverse=True)
+        if top_k is not None:
+            return heapq.nlargest(top_k, risks, key=self._risk_priority)
+        return sorted(risks, key=self._risk_priority, reverse=True)
+    
+    def _analyze_in_pool(self, changes: List[CodeChange]) -> None:
+        """Analyze uncached changes across worker processes, filling the risk cache."""
+        pending = {}
+        for change in changes:
+            key = self._cache_key(change)
+            if key not in self._risk_cache:
+                pending.setdefault(key, change)
+        
+        if not pending:
+            return
+        
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(type(self),)
+        ) as pool:
+            results = pool.map(_analyze_in_worker, pending.values(), chunksize=16)
+            for key, risks in zip(pending.keys(), results):
+                self._risk_cache.put(key, risks)
+    
+    def _cache_key(self, change: CodeChange) -> str:
+        """Key a change by everything that influences its analysis."""
+        # Producer-supplied lines replace the diff text, and full contents switch
+        # parameter detection to the AST path, so all of them are part of the key
+        return hashlib.sha256(json.dumps([
+            change.change_type,
+            change.file_path,
+            change.diff,
+            change.removed_lines,
+            change.added_lines,
+            change.old_content,
+            change.new_content,
+        ]).encode()).hexdigest()
+    
+    def _analyze_change(self, change: CodeChange, context: Dict[str, Any]) -> List[RegressionRisk]:
+        """Analyze a single change, reusing results for identical changes."""
+        key = self._cache_key(change)
+        risks = self._risk_cache.get(key)
+        if risks is None:
+            risks = self._analyze_uncached(change, context)
+            self._risk_cache.put(key, risks)
+        
+        # Hand out copies so callers cannot alter the cached risks
+        return [risk.model_copy(deep=True) for risk in risks]
+    
+    def _analyze_uncached(self, change: CodeChange, context: Dict[str, Any]) -> List[RegressionRisk]:
+        """Dispatch a change to the analyzer for its change type."""
+        # Analyze different types of changes
+        if change.change_type in ["modify", "delete"]:
+            risks = self._analyze_modification(change, context)
+        elif change.change_type == "add":
+            risks = self._analyze_addition(change, context)
+        elif change.change_type == "rename":
+            risks = self._analyze_rename(change, context)
+        else:
+            risks = []
+        
+        return risks
     
     def _analyze_modification(self, change: CodeChange, context: Dict[str, Any]) -> List[RegressionRisk]:
         """Analyze modifications for regressions."""
         risks = []
         
-        # Parse the diff
-        diff_lines = change.diff.split('\n')
-        removed_lines = [l[1:] for l in diff_lines if l.startswith('-') and not l.startswith('---')]
-        added_lines = [l[1:] for l in diff_lines if l.startswith('+') and not l.startswith('+++')]
+        # Split and classify the diff in one pass; the checks only read the summaries
+        removed, added = _DiffSide(), _DiffSide()
+        if change.removed_lines or change.added_lines:
+            # Lines captured by the diff producer
+            for line in change.removed_lines:
+                removed.add(line)
+            for line in change.added_lines:
+                added.add(line)
+        else:
+            for line in change.diff.splitlines():
+                if line.startswith('-'):
+                    if not line.startswith('---'):
+                        removed.add(line[1:])
+                elif line.startswith('+') and not line.startswith('+++'):
+                    added.add(line[1:])
         
         # Check for API changes
-        api_risks = self._check_api_changes(removed_lines, added_lines, change.file_path)
+        api_risks = self._check_api_changes(
+            removed.lines, added.lines, change.file_path,
+            change.old_content, change.new_content
+        )
         risks.extend(api_risks)
         
         # Check for behavior changes
-        behavior_risks = self._check_behavior_changes(removed_lines, added_lines, change.file_path)
+        behavior_risks = self._check_behavior_changes(removed, added, change.file_path)
         risks.extend(behavior_risks)
         
         # Check for performance impacts
-        perf_risks = self._check_performance_impacts(removed_lines, added_lines, change.file_path)
+        perf_risks = self._check_performance_impacts(removed, added, change.file_path)
         risks.extend(perf_risks)
         
         # Check for security impacts
-        security_risks = self._check_security_impacts(removed_lines, added_lines, change.file_path)
+        security_risks = self._check_security_impacts(removed, added, change.file_path)
         risks.extend(security_risks)
         
         return risks
     
-    def _check_api_changes(self, removed: List[str], added: List[str], file_path: str) -> List[RegressionRisk]:
+    def _check_api_changes(
+        self,
+        removed: List[str],
+        added: List[str],
+        file_path: str,
+        old_content: Optional[str] = None,
+        new_content: Optional[str] = None
+    ) -> List[RegressionRisk]:
         """Check for API breaking changes."""
         risks = []
         
+        # Group removed endpoint lines under every route style they match
+        removed_matches = {}
+        for line in removed:
+            for route_style in self._route_styles(line):
+                removed_matches.setdefault(route_style, []).append(line.strip())
+        
+        added_styles = set()
+        if removed_matches:
+            for line in added:
+                added_styles.update(self._route_styles(line))
+        
         # Check for removed endpoints
-        for pattern_name, pattern in self.api_patterns.items():
-            removed_matches = []
-            for line in removed:
-                if pattern.search(line):
-                    removed_matches.append(line.strip())
-            
-            if removed_matches:
-                # Check if they were replaced
-                added_matches = [l for l in added if pattern.search(l)]
-                
-                if not added_matches:
-                    risks.append(RegressionRisk(
-                        type="api_change",
-                        severity="critical",
-                        description=f"API endpoint removed: {removed_matches[0]}",
-                        affected_components=[file_path],
-                        mitigation="Add deprecation notice and migration path",
-                        test_suggestions=[
-                            "Test all client applications",
-                            "Verify API backward compatibility",
-                            "Check API documentation updates"
-                        ]
-                    ))
-                else:
-                    # Endpoint modified
-                    risks.append(RegressionRisk(
-                        type="api_change",
-                        severity="high",
-                        description=f"API endpoint modified in {file_path}",
-                        affected_components=[file_path],
-                        mitigation="Ensure backward compatibility or version the API",
-                        test_suggestions=[
-                            "Test with existing API clients",
-                            "Verify request/response format compatibility",
-                            "Update API tests"
-                        ]
-                    ))
+        # Walk styles in table order so risks come out in a stable order
+        for route_style in _API_STYLE_PATTERNS:
+            matches = removed_matches.get(route_style)
+            if not matches:
+                continue
+            # Check if they were replaced
+            if route_style not in added_styles:
+                risks.append(_make_risk(
+                    "api_endpoint_removed",
+                    description=f"API endpoint removed: {matches[0]}",
+                    affected_components=[file_path]
+                ))
+            else:
+                # Endpoint modified
+                risks.append(_make_risk(
+                    "api_endpoint_modified",
+                    description=f"API endpoint modified in {file_path}",
+                    affected_components=[file_path]
+                ))
         
         # Check for parameter changes
-        param_changes = self._detect_parameter_changes(removed, added)
+        param_changes = self._detect_parameter_changes(removed, added, old_content, new_content)
         for param_change in param_changes:
-            risks.append(RegressionRisk(
-                type="api_change",
-                severity="high" if param_change["removed"] else "medium",
+            risks.append(_make_risk(
+                "api_parameters_changed",
+                severity="high" if param_change["removed"] or param_change["reordered"] else "medium",
                 description=f"Function parameters changed: {param_change['function']}",
                 affected_components=[file_path],
-                mitigation="Update all callers or maintain backward compatibility",
-                test_suggestions=[
+                test_suggestions=(
                     f"Test all calls to {param_change['function']}",
                     "Verify parameter validation",
-                    "Check default parameter values"
-                ]
+                    "Check default parameter values",
+                )
             ))
         
         return risks
     
-    def _check_behavior_changes(self, removed: List[str], added: List[str], file_path: str) -> List[RegressionRisk]:
+    def _route_styles(self, line: str) -> List[str]:
+        """Return every route style whose endpoint pattern matches the line."""
+        # A line can match several styles, e.g. `@router.get(...)` is both FastAPI and Express
+        if not self.api_pattern.search(line):
+            return []
+        return [style for style, pattern in _API_STYLE_PATTERNS.items() if pattern.search(line)]
+    
+    def _check_behavior_changes(self, removed: _DiffSide, added: _DiffSide, file_path: str) -> List[RegressionRisk]:
         """Check for behavioral changes."""
         risks = []
         
         # Check for changed conditionals
-        removed_conditions = [l for l in removed if any(kw in l for kw in ['if ', 'elif ', 'while ', 'for '])]
-        added_conditions = [l for l in added if any(kw in l for kw in ['if ', 'elif ', 'while ', 'for '])]
-        
-        if removed_conditions and added_conditions:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="high",
-                description="Control flow logic modified",
-                affected_components=[file_path],
-                mitigation="Ensure all edge cases are covered",
-                test_suggestions=[
-                    "Test all conditional branches",
-                    "Verify edge cases",
-                    "Check boundary conditions"
-                ]
+        if removed.count(_CONDITION) and added.count(_CONDITION):
+            risks.append(_make_risk(
+                "control_flow_modified",
+                affected_components=[file_path]
             ))
         
         # Check for changed return values
-        removed_returns = [l for l in removed if 'return ' in l]
-        added_returns = [l for l in added if 'return ' in l]
-        
-        if removed_returns != added_returns:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="high",
-                description="Return values modified",
-                affected_components=[file_path],
-                mitigation="Verify all callers handle new return values",
-                test_suggestions=[
-                    "Test return value compatibility",
-                    "Check error handling",
-                    "Verify type consistency"
-                ]
+        if removed.returns != added.returns:
+            risks.append(_make_risk(
+                "return_values_modified",
+                affected_components=[file_path]
             ))
         
         # Check for exception handling changes
-        removed_exceptions = [l for l in removed if any(kw in l for kw in ['except ', 'raise ', 'try:'])]
-        added_exceptions = [l for l in added if any(kw in l for kw in ['except ', 'raise ', 'try:'])]
-        
-        if removed_exceptions or added_exceptions:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="medium",
-                description="Exception handling modified",
-                affected_components=[file_path],
-                mitigation="Ensure error handling remains robust",
-                test_suggestions=[
-                    "Test error scenarios",
-                    "Verify exception propagation",
-                    "Check error messages"
-                ]
+        if removed.count(_EXCEPTION) or added.count(_EXCEPTION):
+            risks.append(_make_risk(
+                "exception_handling_modified",
+                affected_components=[file_path]
             ))
         
         return risks
     
-    def _check_performance_impacts(self, removed: List[str], added: List[str], file_path: str) -> List[RegressionRisk]:
+    def _check_performance_impacts(self, removed: _DiffSide, added: _DiffSide, file_path: str) -> List[RegressionRisk]:
         """Check for potential performance impacts."""
         risks = []
         
         # Check for added loops
-        removed_loops = len([l for l in removed if any(kw in l for kw in ['for ', 'while '])])
-        added_loops = len([l for l in added if any(kw in l for kw in ['for ', 'while '])])
-        
-        if added_loops > removed_loops:
-            risks.append(RegressionRisk(
-                type="performance",
-                severity="medium",
-                description="Additional loops added, potential performance impact",
-                affected_components=[file_path],
-                mitigation="Profile code and optimize if necessary",
-                test_suggestions=[
-                    "Run performance benchmarks",
-                    "Test with large datasets",
-                    "Monitor resource usage"
-                ]
+        if added.count(_LOOP) > removed.count(_LOOP):
+            risks.append(_make_risk(
+                "loops_added",
+                affected_components=[file_path]
             ))
         
         # Check for database query changes
-        db_patterns = ['SELECT', 'INSERT', 'UPDATE', 'DELETE', '.query(', '.filter(', '.all()', '.first()']
-        removed_queries = sum(1 for l in removed if any(p in l for p in db_patterns))
-        added_queries = sum(1 for l in added if any(p in l for p in db_patterns))
-        
-        if added_queries > removed_queries:
-            risks.append(RegressionRisk(
-                type="performance",
-                severity="high",
-                description="Additional database queries detected",
-                affected_components=[file_path],
-                mitigation="Consider query optimization or caching",
-                test_suggestions=[
-                    "Profile database queries",
-                    "Check for N+1 query problems",
-                    "Test query performance"
-                ]
+        if added.count(_DB_QUERY) > removed.count(_DB_QUERY):
+            risks.append(_make_risk(
+                "db_queries_added",
+                affected_components=[file_path]
             ))
         
         # Check for synchronous I/O in async context
-        if any('async ' in l for l in added):
-            sync_io = [l for l in added if any(p in l for p in ['open(', 'requests.', 'urllib.'])]
-            if sync_io:
-                risks.append(RegressionRisk(
-                    type="performance",
-                    severity="high",
-                    description="Synchronous I/O in async function",
-                    affected_components=[file_path],
-                    mitigation="Use async I/O libraries",
-                    test_suggestions=[
-                        "Test async performance",
-                        "Check for blocking operations",
-                        "Monitor event loop"
-                    ]
-                ))
+        if added.count(_ASYNC) and added.count(_SYNC_IO):
+            risks.append(_make_risk(
+                "sync_io_in_async",
+                affected_components=[file_path]
+            ))
         
         return risks
     
-    def _check_security_impacts(self, removed: List[str], added: List[str], file_path: str) -> List[RegressionRisk]:
+    def _check_security_impacts(self, removed: _DiffSide, added: _DiffSide, file_path: str) -> List[RegressionRisk]:
         """Check for security impacts."""
         risks = []
         
         # Check for SQL injection risks
-        sql_patterns = [
-            r'\.format\s*\(.*\).*(?:SELECT|INSERT|UPDATE|DELETE)',
-            r'%\s*\(.*\).*(?:SELECT|INSERT|UPDATE|DELETE)',
-            r'\+.*(?:SELECT|INSERT|UPDATE|DELETE)',
-        ]
-        
-        for pattern in sql_patterns:
-            if any(re.search(pattern, l, re.IGNORECASE) for l in added):
-                risks.append(RegressionRisk(
-                    type="security",
-                    severity="critical",
-                    description="Potential SQL injection vulnerability",
-                    affected_components=[file_path],
-                    mitigation="Use parameterized queries",
-                    test_suggestions=[
-                        "Test with malicious input",
-                        "Run security scanning tools",
-                        "Review query construction"
-                    ]
-                ))
-                break
+        if any(self.sql_injection_pattern.search(l) for l in added.lines):
+            risks.append(_make_risk(
+                "sql_injection",
+                affected_components=[file_path]
+            ))
         
         # Check for removed authentication/authorization
-        auth_patterns = ['@login_required', '@requires_auth', 'check_permission', 'authenticate']
-        removed_auth = any(any(p in l for p in auth_patterns) for l in removed)
-        added_auth = any(any(p in l for p in auth_patterns) for l in added)
-        
-        if removed_auth and not added_auth:
-            risks.append(RegressionRisk(
-                type="security",
-                severity="critical",
-                description="Authentication/authorization checks removed",
-                affected_components=[file_path],
-                mitigation="Ensure proper access controls remain in place",
-                test_suggestions=[
-                    "Test unauthorized access attempts",
-                    "Verify permission checks",
-                    "Audit access logs"
-                ]
+        if removed.count(_AUTH) and not added.count(_AUTH):
+            risks.append(_make_risk(
+                "auth_removed",
+                affected_components=[file_path]
             ))
         
         # Check for hardcoded secrets
-        secret_patterns = [
-            r'(?:password|secret|key|token)\s*=\s*["\'][^"\']+["\']',
-            r'(?:AWS|AZURE|GCP)_[A-Z_]+\s*=\s*["\'][^"\']+["\']'
-        ]
-        
-        for pattern in secret_patterns:
-            if any(re.search(pattern, l, re.IGNORECASE) for l in added):
-                risks.append(RegressionRisk(
-                    type="security",
-                    severity="critical",
-                    description="Hardcoded secrets detected",
-                    affected_components=[file_path],
-                    mitigation="Use environment variables or secret management service",
-                    test_suggestions=[
-                        "Scan for exposed secrets",
-                        "Verify secret rotation",
-                        "Check environment configuration"
-                    ]
-                ))
-                break
+        if any(self.secret_pattern.search(l) for l in added.lines):
+            risks.append(_make_risk(
+                "hardcoded_secrets",
+                affected_components=[file_path]
+            ))
         
         return risks
     
-    def _detect_parameter_changes(self, removed: List[str], added: List[str]) -> List[Dict[str, Any]]:
+    def _detect_parameter_changes(
+        self,
+        removed: List[str],
+        added: List[str],
+        old_content: Optional[str] = None,
+        new_content: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """Detect function parameter changes."""
         changes = []
         
-        # Simple pattern matching for function definitions
-        func_pattern = r'def\s+(\w+)\s*\(([^)]*)\)'
-        
-        removed_funcs = {}
-        for line in removed:
-            match = re.search(func_pattern, line)
-            if match:
-                func_name = match.group(1)
-                params = [p.strip() for p in match.group(2).split(',') if p.strip()]
-                removed_funcs[func_name] = params
-        
-        added_funcs = {}
-        for line in added:
-            match = re.search(func_pattern, line)
-            if match:
-                func_name = match.group(1)
-                params = [p.strip() for p in match.group(2).split(',') if p.strip()]
-                added_funcs[func_name] = params
-        
-        # Compare parameters
-        for func_name in set(removed_funcs.keys()) & set(added_funcs.keys()):
-            if removed_funcs[func_name] != added_funcs[func_name]:
+        # Prefer full-file ASTs, which handle multi-line and decorated signatures
+        removed_funcs = added_funcs = None
+        if old_content is not None and new_content is not None:
+            removed_funcs = self._function_params_from_source(old_content)
+            added_funcs = self._function_params_from_source(new_content)
+        
+        if removed_funcs is None or added_funcs is None:
+            removed_funcs = self._function_params_from_lines(removed)
+            added_funcs = self._function_params_from_lines(added)
+        
+        # Compare parameters positionally so reorders count as changes
+        for func_name in removed_funcs.keys() & added_funcs.keys():
+            old_params = removed_funcs[func_name]
+            new_params = added_funcs[func_name]
+            if old_params != new_params:
+                kept_old = [p for p in old_params if p in new_params]
+                kept_new = [p for p in new_params if p in old_params]
                 changes.append({
                     "function": func_name,
-                    "removed": list(set(removed_funcs[func_name]) - set(added_funcs[func_name])),
-                    "added": list(set(added_funcs[func_name]) - set(removed_funcs[func_name]))
+                    "removed": [p for p in old_params if p not in new_params],
+                    "added": [p for p in new_params if p not in old_params],
+                    "reordered": kept_old != kept_new
                 })
         
         return changes
     
+    def _function_params_from_lines(self, lines: List[str]) -> Dict[str, List[str]]:
+        """Extract parameters from single-line function definitions in diff lines."""
+        funcs = {}
+        for line in lines:
+            match = _FUNC_DEF_RE.search(line)
+            if match:
+                func_name = match.group(1)
+                params = [p.strip() for p in match.group(2).split(',') if p.strip()]
+                funcs[func_name] = params
+        return funcs
+    
+    def _function_params_from_source(self, source: str) -> Optional[Dict[str, List[str]]]:
+        """Extract the signature of every function in a module, or None if it does not parse."""
+        key = hashlib.sha256(source.encode()).digest()
+        if key in self._signature_cache:
+            return self._signature_cache.get(key)
+        
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            funcs = None
+        else:
+            funcs = {}
+            self._collect_signatures(tree, "", source, funcs)
+        
+        # Only the derived signatures are kept, not the tree
+        self._signature_cache.put(key, funcs)
+        return funcs
+    
+    def _collect_signatures(
+        self,
+        node: ast.AST,
+        prefix: str,
+        source: str,
+        funcs: Dict[str, List[str]]
+    ) -> None:
+        """Record signatures under qualified names such as `Class.method`."""
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = prefix + child.name
+                funcs[name] = self._signature_params(child.args, source)
+                self._collect_signatures(child, name + ".", source, funcs)
+            elif isinstance(child, ast.ClassDef):
+                self._collect_signatures(child, prefix + child.name + ".", source, funcs)
+            else:
+                self._collect_signatures(child, prefix, source, funcs)
+    
+    def _signature_params(self, args: ast.arguments, source: str) -> List[str]:
+        """Render parameters with annotations, defaults and `/`, `*`, `**` markers."""
+        def render(arg: ast.arg, default: Optional[ast.expr] = None, marker: str = "") -> str:
+            text = marker + arg.arg
+            if arg.annotation is not None:
+                text += ": " + ast.get_source_segment(source, arg.annotation)
+            if default is not None:
+                text += "=" + ast.get_source_segment(source, default)
+            return text
+        
+        positional = args.posonlyargs + args.args
+        defaults = [None] * (len(positional) - len(args.defaults)) + args.defaults
+        
+        params = []
+        for index, (arg, default) in enumerate(zip(positional, defaults)):
+            params.append(render(arg, default))
+            if index == len(args.posonlyargs) - 1:
+                params.append("/")
+        if args.vararg is not None:
+            params.append(render(args.vararg, marker="*"))
+        elif args.kwonlyargs:
+            params.append("*")
+        params.extend(render(arg, default) for arg, default in zip(args.kwonlyargs, args.kw_defaults))
+        if args.kwarg is not None:
+            params.append(render(args.kwarg, marker="**"))
+        return params
+    
     def _analyze_addition(self, change: CodeChange, context: Dict[str, Any]) -> List[RegressionRisk]:
         """Analyze new file additions."""
         risks = []
         
         # Check if new dependencies are introduced
         if 'import' in change.diff or 'require' in change.diff:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="low",
-                description="New dependencies introduced",
-                affected_components=[change.file_path],
-                mitigation="Verify dependency compatibility and security",
-                test_suggestions=[
-                    "Check dependency versions",
-                    "Run security audit",
-                    "Test in isolated environment"
-                ]
+            risks.append(_make_risk(
+                "new_dependencies",
+                affected_components=[change.file_path]
             ))
         
         return risks
@@ -378,17 +802,10 @@ class RegressionDetector:
         """Analyze file renames."""
         risks = []
         
-        risks.append(RegressionRisk(
-            type="api_change",
-            severity="medium",
+        risks.append(_make_risk(
+            "file_renamed",
             description=f"File renamed: {change.file_path}",
-            affected_components=[change.file_path],
-            mitigation="Update all imports and references",
-            test_suggestions=[
-                "Verify all imports are updated",
-                "Check configuration files",
-                "Test module loading"
-            ]
+            affected_components=[change.file_path]
         ))
         
         return risks
@@ -397,96 +814,47 @@ class RegressionDetector:
         """Analyze impacts across multiple files."""
         risks = []
         
-        # Check for interface changes that affect multiple files
+        # Check for interface changes that affect multiple files; a single
+        # change can never touch more than one interface file
         modified_interfaces = set()
-        for change in changes:
-            if change.change_type == "modify" and any(
-                keyword in change.diff for keyword in ['class ', 'interface ', 'trait ']
-            ):
-                modified_interfaces.add(change.file_path)
+        if len(changes) > 1:
+            for change in changes:
+                if change.change_type == "modify" and any(
+                    keyword in change.diff for keyword in _INTERFACE_KEYWORDS
+                ):
+                    modified_interfaces.add(change.file_path)
         
         if len(modified_interfaces) > 1:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="high",
-                description="Multiple interfaces modified simultaneously",
-                affected_components=list(modified_interfaces),
-                mitigation="Ensure all implementations are updated consistently",
-                test_suggestions=[
-                    "Run integration tests",
-                    "Verify interface contracts",
-                    "Check for version mismatches"
-                ]
+            risks.append(_make_risk(
+                "interfaces_modified",
+                affected_components=list(modified_interfaces)
             ))
         
         # Check for cascading changes
         if len(changes) > 10:
-            risks.append(RegressionRisk(
-                type="behavior_change",
-                severity="medium",
-                description="Large number of files changed",
-                affected_components=[c.file_path for c in changes[:5]] + ["..."],
-                mitigation="Consider breaking into smaller, incremental changes",
-                test_suggestions=[
-                    "Run comprehensive test suite",
-                    "Perform staged rollout",
-                    "Monitor system behavior closely"
-                ]
+            risks.append(_make_risk(
+                "many_files_changed",
+                affected_components=[c.file_path for c in changes[:5]] + ["..."]
             ))
         
         return risks
     
-    def _compile_api_patterns(self) -> Dict[str, re.Pattern]:
-        """Compile regex patterns for API detection."""
-        return {
-            "flask_route": re.compile(r'@app\.route\s*\([\'"]([^\'"]+)[\'"]\)'),
-            "fastapi_route": re.compile(r'@(app|router)\.(get|post|put|delete|patch)\s*\([\'"]([^\'"]+)[\'"]\)'),
-            "django_url": re.compile(r'path\s*\([\'"]([^\'"]+)[\'"]'),
-            "express_route": re.compile(r'(app|router)\.(get|post|put|delete|patch)\s*\([\'"]([^\'"]+)[\'"]'),
-        }
-    
-    def _compile_behavior_patterns(self) -> Dict[str, re.Pattern]:
-        """Compile regex patterns for behavior detection."""
-        return {
-            "function_def": re.compile(r'def\s+(\w+)\s*\(([^)]*)\)'),
-            "class_def": re.compile(r'class\s+(\w+)'),
-            "conditional": re.compile(r'(if|elif|while|for)\s+'),
-            "exception": re.compile(r'(try:|except\s+|raise\s+)'),
-            "return": re.compile(r'return\s+'),
-        }
-    
     def _deduplicate_risks(self, risks: List[RegressionRisk]) -> List[RegressionRisk]:
-        """Remove duplicate risks."""
-        seen = set()
-        unique_risks = []
+        """Remove duplicate risks, keeping the first occurrence of each."""
+        unique_risks = {}
         
         for risk in risks:
-            key = (risk.type, risk.description, tuple(risk.affected_components))
-            if key not in seen:
-                seen.add(key)
-                unique_risks.append(risk)
+            unique_risks.setdefault(
+                (risk.type, risk.description, tuple(risk.affected_components)), risk
+            )
         
-        return unique_risks
+        return list(unique_risks.values())
     
     def _risk_priority(self, risk: RegressionRisk) -> int:
-        """Calculate risk priority for sorting."""
-        severity_scores = {
-            "critical": 4,
-            "high": 3,
-            "medium": 2,
-            "low": 1
-        }
-        
-        type_scores = {
-            "security": 4,
-            "api_change": 3,
-            "behavior_change": 2,
-            "performance": 1
-        }
-        
+        """Return the risk priority used for sorting."""
         return (
-            severity_scores.get(risk.severity, 0) * 10 +
-            type_scores.get(risk.type, 0)
+            _SEVERITY_SCORES.get(risk.severity, 0) * 10 +
+            _RISK_TYPE_SCORES.get(risk.type, 0)
         )
     
     def generate_regression_report(self, risks: List[RegressionRisk], step: RefactorStep) -> str:
@@ -494,36 +862,54 @@ class RegressionDetector:
         if not risks:
             return f"No regression risks detected for step: {step.description}"
         
-        report = f"# Regression Analysis Report\n\n"
-        report += f"**Step**: {step.description}\n"
-        report += f"**Type**: {step.type.value}\n"
-        report += f"**Risk Level**: {step.risk_level}\n\n"
+        buf = io.StringIO()
+        w = buf.write
         
-        report += "## Detected Risks\n\n"
+        w("# Regression Analysis Report\n\n")
+        w(f"**Step**: {step.description}\n")
+        w(f"**Type**: {step.type.value}\n")
+        w(f"**Risk Level**: {step.risk_level}\n\n")
+        
+        w("## Detected Risks\n\n")
         
         # Group by severity
-        by_severity = {}
+        by_severity = defaultdict(list)
         for risk in risks:
-            by_severity.setdefault(risk.severity, []).append(risk)
-        
-        for severity in ["critical", "high", "medium", "low"]:
-            if severity in by_severity:
-                report += f"### {severity.upper()} Severity\n\n"
-                for risk in by_severity[severity]:
-                    report += f"**{risk.type}**: {risk.description}\n"
-                    report += f"- Affected: {', '.join(risk.affected_components)}\n"
+            by_severity[risk.severity].append(risk)
+        
+        for severity in _SEVERITY_ORDER:
+            severity_risks = by_severity.get(severity)
+            if severity_risks:
+                w(f"### {severity.upper()} Severity\n\n")
+                for risk in severity_risks:
+                    w(f"**{risk.type}**: {risk.description}\n")
+                    w(f"- Affected: {', '.join(risk.affected_components)}\n")
                     if risk.mitigation:
-                        report += f"- Mitigation: {risk.mitigation}\n"
+                        w(f"- Mitigation: {risk.mitigation}\n")
                     if risk.test_suggestions:
-                        report += f"- Tests needed:\n"
-                        for test in risk.test_suggestions:
-                            report += f"  - {test}\n"
-                    report += "\n"
-        
-        report += "## Recommendations\n\n"
-        report += "1. Address all critical and high severity risks before proceeding\n"
-        report += "2. Implement suggested tests for each risk area\n"
-        report += "3. Consider breaking large changes into smaller steps\n"
-        report += "4. Set up monitoring for affected components\n"
-        
-        return report
\ No newline at end of file
+                        w("- Tests needed:\n")
+                        buf.writelines(f"  - {test}\n" for test in risk.test_suggestions)
+                    w("\n")
+        
+        w("## Recommendations\n\n")
+        w("1. Address all critical and high severity risks before proceeding\n")
+        w("2. Implement suggested tests for each risk area\n")
+        w("3. Consider breaking large changes into smaller steps\n")
+        w("4. Set up monitoring for affected components\n")
+        
+        return buf.getvalue()
+
+
+# Detector owned by each pool worker, built once by the pool initializer
+_worker_detector: Optional[RegressionDetector] = None
+
+
+def _init_worker(detector_cls: Type[RegressionDetector]) -> None:
+    # Build the caller's class so subclass overrides also apply in workers
+    global _worker_detector
+    _worker_detector = detector_cls()
+
+
+def _analyze_in_worker(change: CodeChange) -> List[RegressionRisk]:
+    # Per-change analysis never reads the context, so it is not shipped to workers
+    return _worker_detector._analyze_uncached(change, {})
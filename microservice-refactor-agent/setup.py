@@ -47,6 +47,7 @@ setup(
             "pytest>=7.3.0",
             "pytest-cov>=4.0.0",
             "pytest-mock>=3.10.0",
+            "pytest-xdist>=3.0.0",
             "flake8>=6.0.0",
             "mypy>=1.3.0",
         ]
@@ -1,24 +1,43 @@
 """Tests for the code and architecture analyzer components."""
 
 import pytest
-from pathlib import Path
-import tempfile
 import os
 
 from refactor_agent.analyzer import CodeAnalyzer, ArchitectureAnalyzer
 from refactor_agent.models import CodeSmell
 
 
+# Endpoints of the billing "god service" fixture
+_BILLING_ENDPOINTS = (
+    'invoice', 'payment', 'subscription', 'refund', 'credit',
+    'debit', 'balance', 'history', 'report', 'export',
+    'import', 'validate', 'process', 'cancel', 'approve',
+    'reject', 'review', 'audit', 'reconcile', 'dispute',
+    'charge', 'void', 'adjust'
+)
+
+_BILLING_MAIN_PY = """
+from flask import Flask
+app = Flask(__name__)
+
+# Too many endpoints (god service)
+""" + "\n".join(f"""
+@app.route('/api/billing/{endpoint}')
+def {endpoint}():
+    return {{}}
+""" for endpoint in _BILLING_ENDPOINTS)
+
+
 class TestCodeAnalyzer:
     """Test cases for CodeAnalyzer."""
     
-    @pytest.fixture
-    def temp_repo(self):
+    @pytest.fixture(scope="module")
+    def temp_repo(self, tmp_path_factory):
         """Create a temporary repository for testing."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create sample Python file
-            sample_file = Path(tmpdir) / "service.py"
-            sample_file.write_text("""
+        tmpdir = tmp_path_factory.mktemp("analyzer_repo")
+        # Create sample Python file
+        sample_file = tmpdir / "service.py"
+        sample_file.write_text("""
 import requests
 from flask import Flask, jsonify
 
@@ -45,12 +64,21 @@ class UserService:
         query = f"SELECT * FROM users WHERE id = {user_id}"
         return self.db.execute(query)
 """)
-            yield tmpdir
+        return str(tmpdir)
+    
+    @pytest.fixture(scope="module")
+    def analyzer(self, temp_repo):
+        """Create a code analyzer shared by the tests in this module."""
+        return CodeAnalyzer(temp_repo)
     
-    def test_analyze_file(self, temp_repo):
+    @pytest.fixture(scope="module")
+    def service_analysis(self, analyzer):
+        """Analyze service.py once for all tests that inspect it."""
+        return analyzer.analyze_file("service.py")
+    
+    def test_analyze_file(self, service_analysis):
         """Test file analysis."""
-        analyzer = CodeAnalyzer(temp_repo)
-        result = analyzer.analyze_file("service.py")
+        result = service_analysis
         
         assert "error" not in result
         assert len(result["imports"]) == 2
@@ -59,29 +87,26 @@ class UserService:
         assert result["complexity"] > 1
         assert "flask" in result["api_endpoints"][0]["framework"]
     
-    def test_extract_imports(self, temp_repo):
+    def test_extract_imports(self, service_analysis):
         """Test import extraction."""
-        analyzer = CodeAnalyzer(temp_repo)
-        result = analyzer.analyze_file("service.py")
+        result = service_analysis
         
         imports = result["imports"]
         assert any(imp["module"] == "requests" for imp in imports)
         assert any("flask" in imp["module"] for imp in imports)
     
-    def test_extract_api_endpoints(self, temp_repo):
+    def test_extract_api_endpoints(self, service_analysis):
         """Test API endpoint extraction."""
-        analyzer = CodeAnalyzer(temp_repo)
-        result = analyzer.analyze_file("service.py")
+        result = service_analysis
         
         endpoints = result["api_endpoints"]
         assert len(endpoints) == 1
         assert endpoints[0]["path"] == "/api/users"
         assert endpoints[0]["method"] == "GET"
     
-    def test_detect_sql_injection(self, temp_repo):
+    def test_detect_sql_injection(self, service_analysis):
         """Test SQL injection detection in queries."""
-        analyzer = CodeAnalyzer(temp_repo)
-        result = analyzer.analyze_file("service.py")
+        result = service_analysis
         
         # The analyzer should detect the f-string SQL query
         queries = result["database_queries"]
@@ -91,21 +116,21 @@ class UserService:
 class TestArchitectureAnalyzer:
     """Test cases for ArchitectureAnalyzer."""
     
-    @pytest.fixture
-    def multi_service_repo(self):
+    @pytest.fixture(scope="module")
+    def multi_service_repo(self, tmp_path_factory):
         """Create a repository with multiple services."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create multiple services
-            services = ["auth-service", "user-service", "billing-service"]
+        tmpdir = tmp_path_factory.mktemp("services_repo")
+        # Create multiple services
+        services = ["auth-service", "user-service", "billing-service"]
+        
+        for service in services:
+            service_dir = tmpdir / service
+            service_dir.mkdir()
             
-            for service in services:
-                service_dir = Path(tmpdir) / service
-                service_dir.mkdir()
-                
-                # Create main.py for each service
-                main_file = service_dir / "main.py"
-                if service == "auth-service":
-                    main_file.write_text("""
+            # Create main.py for each service
+            main_file = service_dir / "main.py"
+            if service == "auth-service":
+                main_file.write_text("""
 from flask import Flask
 app = Flask(__name__)
 
@@ -117,8 +142,8 @@ def login():
 def logout():
     return {'status': 'ok'}
 """)
-                elif service == "user-service":
-                    main_file.write_text("""
+            elif service == "user-service":
+                main_file.write_text("""
 from flask import Flask
 import requests
 
@@ -134,28 +159,14 @@ def get_users():
 def get_user(id):
     return {'id': id}
 """)
-                else:  # billing-service
-                    main_file.write_text("""
-from flask import Flask
-app = Flask(__name__)
-
-# Too many endpoints (god service)
-""" + "\n".join([f"""
-@app.route('/api/billing/{endpoint}')
-def {endpoint}():
-    return {{}}
-""" for endpoint in [
-    'invoice', 'payment', 'subscription', 'refund', 'credit',
-    'debit', 'balance', 'history', 'report', 'export',
-    'import', 'validate', 'process', 'cancel', 'approve',
-    'reject', 'review', 'audit', 'reconcile', 'dispute',
-    'charge', 'void', 'adjust'
-]]))
-            
-            yield tmpdir, services
+            else:  # billing-service
+                main_file.write_text(_BILLING_MAIN_PY)
+        
+        return str(tmpdir), services
     
-    def test_analyze_architecture(self, multi_service_repo):
-        """Test architecture analysis."""
+    @pytest.fixture(scope="module")
+    def full_analysis(self, multi_service_repo):
+        """Analyze the architecture of all services once."""
         tmpdir, services = multi_service_repo
         
         code_analyzer = CodeAnalyzer(tmpdir)
@@ -166,21 +177,29 @@ def {endpoint}():
             for service in services
         }
         
-        analysis = arch_analyzer.analyze_architecture(service_paths)
+        return arch_analyzer.analyze_architecture(service_paths)
+    
+    @pytest.fixture(scope="module")
+    def billing_analysis(self, multi_service_repo):
+        """Analyze the architecture of the billing service alone."""
+        tmpdir, _ = multi_service_repo
+        
+        code_analyzer = CodeAnalyzer(tmpdir)
+        arch_analyzer = ArchitectureAnalyzer(code_analyzer)
+        
+        return arch_analyzer.analyze_architecture({"billing": "billing-service"})
+    
+    def test_analyze_architecture(self, full_analysis):
+        """Test architecture analysis."""
+        analysis = full_analysis
         
         assert len(analysis.services) == 3
         assert len(analysis.code_smells) > 0
         assert analysis.metrics["total_services"] == 3
     
-    def test_detect_god_service(self, multi_service_repo):
+    def test_detect_god_service(self, billing_analysis):
         """Test god service detection."""
-        tmpdir, services = multi_service_repo
-        
-        code_analyzer = CodeAnalyzer(tmpdir)
-        arch_analyzer = ArchitectureAnalyzer(code_analyzer)
-        
-        service_paths = {"billing": "billing-service"}
-        analysis = arch_analyzer.analyze_architecture(service_paths)
+        analysis = billing_analysis
         
         # Should detect god service smell
         god_service_smells = [
@@ -191,19 +210,9 @@ def {endpoint}():
         assert len(god_service_smells) > 0
         assert god_service_smells[0].severity == "high"
     
-    def test_calculate_metrics(self, multi_service_repo):
+    def test_calculate_metrics(self, full_analysis):
         """Test metrics calculation."""
-        tmpdir, services = multi_service_repo
-        
-        code_analyzer = CodeAnalyzer(tmpdir)
-        arch_analyzer = ArchitectureAnalyzer(code_analyzer)
-        
-        service_paths = {
-            service.replace('-service', ''): service 
-            for service in services
-        }
-        
-        analysis = arch_analyzer.analyze_architecture(service_paths)
+        analysis = full_analysis
         
         assert "total_services" in analysis.metrics
         assert "avg_service_complexity" in analysis.metrics
@@ -1,7 +1,7 @@
 """Tests for Git workflow management."""
 
 import pytest
-import tempfile
+import shutil
 from pathlib import Path
 import git
 
@@ -70,20 +70,19 @@ class TestCommitMessageGenerator:
         assert commit_info.breaking_change is True
         assert len(commit_info.files) == 2
     
-    def test_determine_commit_type(self, generator, sample_step, sample_changes):
+    @pytest.mark.parametrize("refactor_type,expected_type", [
+        (RefactorType.DATABASE_MIGRATION, "feat"),
+        (RefactorType.REMOVE_DEAD_CODE, "chore"),
+        (RefactorType.RESTRUCTURE, "refactor"),
+        (RefactorType.INTERFACE_EXTRACTION, "refactor")
+    ])
+    def test_determine_commit_type(
+        self, generator, sample_step, sample_changes, refactor_type, expected_type
+    ):
         """Test commit type determination."""
-        # Test different step types
-        test_cases = [
-            (RefactorType.DATABASE_MIGRATION, "feat"),
-            (RefactorType.REMOVE_DEAD_CODE, "chore"),
-            (RefactorType.RESTRUCTURE, "refactor"),
-            (RefactorType.INTERFACE_EXTRACTION, "refactor")
-        ]
-        
-        for refactor_type, expected_type in test_cases:
-            sample_step.type = refactor_type
-            commit_type = generator._determine_commit_type(sample_step, sample_changes)
-            assert commit_type == expected_type
+        sample_step.type = refactor_type
+        commit_type = generator._determine_commit_type(sample_step, sample_changes)
+        assert commit_type == expected_type
     
     def test_format_conventional_commit(self, generator):
         """Test conventional commit formatting."""
@@ -123,19 +122,28 @@ class TestCommitMessageGenerator:
 class TestGitWorkflowManager:
     """Test cases for GitWorkflowManager."""
     
+    @pytest.fixture(scope="module")
+    def base_git_repo(self, tmp_path_factory):
+        """Create a git repository with an initial commit, once per module."""
+        repo_dir = tmp_path_factory.mktemp("base_git_repo")
+        repo = git.Repo.init(repo_dir)
+        
+        # Create initial commit
+        test_file = repo_dir / "test.py"
+        test_file.write_text("# Test file\n")
+        repo.index.add(["test.py"])
+        repo.index.commit("Initial commit")
+        repo.close()
+        
+        return repo_dir
+    
     @pytest.fixture
-    def temp_git_repo(self):
-        """Create a temporary git repository."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            repo = git.Repo.init(tmpdir)
-            
-            # Create initial commit
-            test_file = Path(tmpdir) / "test.py"
-            test_file.write_text("# Test file\n")
-            repo.index.add(["test.py"])
-            repo.index.commit("Initial commit")
-            
-            yield tmpdir, repo
+    def temp_git_repo(self, base_git_repo, tmp_path):
+        """Copy the base repository so each test can change it freely."""
+        repo_dir = tmp_path / "repo"
+        shutil.copytree(base_git_repo, repo_dir)
+        
+        return str(repo_dir), git.Repo(repo_dir)
     
     @pytest.fixture
     def git_manager(self, temp_git_repo):
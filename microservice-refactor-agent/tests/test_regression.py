@@ -2,74 +2,185 @@
 
 import pytest
 from refactor_agent.regression import RegressionDetector
-from refactor_agent.models import CodeChange, RefactorStep, RefactorType
+from refactor_agent.models import CodeChange, RefactorStep, RefactorType, RegressionRisk
+
+
+_API_DIFF = """--- a/api/routes.py
++++ b/api/routes.py
+@@ -10,7 +10,7 @@
+     return jsonify(users)
+ 
+-@app.route('/api/users/<id>')
++@app.route('/api/v2/users/<id>')
+ def get_user(id):
+     return jsonify({'id': id})
+"""
+
+_BEHAVIOR_DIFF = """--- a/services/user_service.py
++++ b/services/user_service.py
+@@ -5,8 +5,10 @@
+ def process_user(user_data):
+-    if user_data.get('age') >= 18:
++    if user_data.get('age') >= 21:
+         user_data['status'] = 'adult'
++    elif user_data.get('age') >= 18:
++        user_data['status'] = 'young_adult'
+     else:
+         user_data['status'] = 'minor'
+     return user_data
+"""
+
+_SQL_DIFF = """--- a/db/queries.py
++++ b/db/queries.py
+@@ -3,5 +3,5 @@
+ def get_user(user_id):
+-    query = "SELECT * FROM users WHERE id = %s"
+-    return db.execute(query, (user_id,))
++    query = f"SELECT * FROM users WHERE id = {user_id}"
++    return db.execute(query)
+"""
+
+_PERF_DIFF = """--- a/services/data_processor.py
++++ b/services/data_processor.py
+@@ -5,6 +5,10 @@
+ def process_data(items):
+     results = []
+     for item in items:
+-        results.append(transform(item))
++        for i in range(10):
++            temp = transform(item)
++            for j in range(100):
++                temp = enhance(temp)
++            results.append(temp)
+     return results
+"""
+
+
+class _LabelingDetector(RegressionDetector):
+    """Detector whose modification analysis tags every risk, to tell it apart."""
+    
+    def _analyze_modification(self, change, context):
+        risks = super()._analyze_modification(change, context)
+        for risk in risks:
+            risk.mitigation = "labeled"
+        return risks
 
 
 class TestRegressionDetector:
     """Test cases for RegressionDetector."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def detector(self):
         """Create a regression detector instance."""
         return RegressionDetector()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def api_change(self):
         """Create a sample API change."""
         return CodeChange(
             file_path="api/routes.py",
             change_type="modify",
-            diff="""--- a/api/routes.py
-+++ b/api/routes.py
-@@ -10,7 +10,7 @@
-     return jsonify(users)
- 
--@app.route('/api/users/<id>')
-+@app.route('/api/v2/users/<id>')
- def get_user(id):
-     return jsonify({'id': id})
-""",
+            diff=_API_DIFF,
             line_changes={"added": 1, "removed": 1},
             semantic_changes=["Modified API endpoint path"]
         )
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def behavior_change(self):
         """Create a sample behavior change."""
         return CodeChange(
             file_path="services/user_service.py",
             change_type="modify",
-            diff="""--- a/services/user_service.py
-+++ b/services/user_service.py
-@@ -5,8 +5,10 @@
- def process_user(user_data):
--    if user_data.get('age') >= 18:
-+    if user_data.get('age') >= 21:
-         user_data['status'] = 'adult'
-+    elif user_data.get('age') >= 18:
-+        user_data['status'] = 'young_adult'
-     else:
-         user_data['status'] = 'minor'
-     return user_data
-""",
+            diff=_BEHAVIOR_DIFF,
             line_changes={"added": 4, "removed": 2},
             semantic_changes=["Modified age validation logic"]
         )
     
-    def test_detect_api_changes(self, detector, api_change):
+    @pytest.fixture(scope="module")
+    def api_change_risks(self, detector, api_change):
+        """Analyze the sample API change once."""
+        return detector.analyze_changes([api_change], {})
+    
+    @pytest.fixture(scope="module")
+    def behavior_change_risks(self, detector, behavior_change):
+        """Analyze the sample behavior change once."""
+        return detector.analyze_changes([behavior_change], {})
+    
+    def test_detect_api_changes(self, api_change_risks):
         """Test API change detection."""
-        risks = detector.analyze_changes([api_change], {})
-        
-        api_risks = [r for r in risks if r.type == "api_change"]
+        api_risks = [r for r in api_change_risks if r.type == "api_change"]
         assert len(api_risks) > 0
         assert api_risks[0].severity in ["high", "critical"]
         assert "endpoint" in api_risks[0].description.lower()
     
-    def test_detect_behavior_changes(self, detector, behavior_change):
-        """Test behavior change detection."""
-        risks = detector.analyze_changes([behavior_change], {})
+    def test_endpoint_rewritten_in_overlapping_route_style(self, detector):
+        """Test an Express route replaced by a FastAPI decorator counts as modified, not removed."""
+        change = CodeChange(
+            file_path="api/users.py",
+            change_type="modify",
+            diff="""--- a/api/users.py
++++ b/api/users.py
+@@ -1,2 +1,2 @@
+-router.get('/users', list_users)
++@router.get('/v2/users')
+ def list_users():
+""",
+            line_changes={"added": 1, "removed": 1},
+            semantic_changes=["Moved endpoint to a decorator"]
+        )
+    
+        risks = detector.analyze_changes([change], {})
+    
+        endpoint_risks = [r for r in risks if "API endpoint" in r.description]
+        assert len(endpoint_risks) == 1
+        assert endpoint_risks[0].severity == "high"
+        assert "modified" in endpoint_risks[0].description
+    
+    def test_removed_endpoints_follow_route_style_order(self, detector):
+        """Test removed endpoints are reported in route-style order, not diff order."""
+        change = CodeChange(
+            file_path="api/orders.py",
+            change_type="modify",
+            diff="""--- a/api/orders.py
++++ b/api/orders.py
+@@ -1,2 +0,0 @@
+-app.post('/orders', create_order)
+-@router.get('/orders')
+""",
+            line_changes={"added": 0, "removed": 2},
+            semantic_changes=["Removed order endpoints"]
+        )
+        
+        risks = detector.analyze_changes([change], {})
         
-        behavior_risks = [r for r in risks if r.type == "behavior_change"]
+        removed = [r.description for r in risks if "API endpoint removed" in r.description]
+        assert removed == [
+            "API endpoint removed: @router.get('/orders')",
+            "API endpoint removed: app.post('/orders', create_order)",
+        ]
+    
+    def test_analyze_producer_supplied_lines(self, detector):
+        """Test that added/removed lines are analyzed when the diff text is not a unified diff."""
+        change = CodeChange(
+            file_path="api/admin.py",
+            change_type="modify",
+            diff="<diff omitted>",
+            line_changes={"added": 2, "removed": 2},
+            semantic_changes=["Relaxed admin check"],
+            removed_lines=["@login_required", "    if user.is_admin:"],
+            added_lines=["    if user.is_staff:", "    api_token = 'abc123'"]
+        )
+    
+        risks = detector.analyze_changes([change], {})
+    
+        descriptions = {r.description for r in risks}
+        assert "Authentication/authorization checks removed" in descriptions
+        assert "Hardcoded secrets detected" in descriptions
+        assert "Control flow logic modified" in descriptions
+    
+    def test_detect_behavior_changes(self, behavior_change_risks):
+        """Test behavior change detection."""
+        behavior_risks = [r for r in behavior_change_risks if r.type == "behavior_change"]
         assert len(behavior_risks) > 0
         assert behavior_risks[0].severity == "high"
         assert "control flow" in behavior_risks[0].description.lower()
@@ -79,15 +190,7 @@ class TestRegressionDetector:
         sql_change = CodeChange(
             file_path="db/queries.py",
             change_type="modify",
-            diff="""--- a/db/queries.py
-+++ b/db/queries.py
-@@ -3,5 +3,5 @@
- def get_user(user_id):
--    query = "SELECT * FROM users WHERE id = %s"
--    return db.execute(query, (user_id,))
-+    query = f"SELECT * FROM users WHERE id = {user_id}"
-+    return db.execute(query)
-""",
+            diff=_SQL_DIFF,
             line_changes={"added": 2, "removed": 2},
             semantic_changes=["Modified SQL query construction"]
         )
@@ -104,20 +207,7 @@ class TestRegressionDetector:
         perf_change = CodeChange(
             file_path="services/data_processor.py",
             change_type="modify",
-            diff="""--- a/services/data_processor.py
-+++ b/services/data_processor.py
-@@ -5,6 +5,10 @@
- def process_data(items):
-     results = []
-     for item in items:
--        results.append(transform(item))
-+        for i in range(10):
-+            temp = transform(item)
-+            for j in range(100):
-+                temp = enhance(temp)
-+            results.append(temp)
-     return results
-""",
+            diff=_PERF_DIFF,
             line_changes={"added": 6, "removed": 1},
             semantic_changes=["Added nested loops"]
         )
@@ -128,10 +218,78 @@ class TestRegressionDetector:
         assert len(perf_risks) > 0
         assert "loops" in perf_risks[0].description.lower()
     
-    def test_generate_regression_report(self, detector, api_change):
-        """Test regression report generation."""
-        risks = detector.analyze_changes([api_change], {})
+    def test_inline_keywords_do_not_count_as_statements(self, detector):
+        """Test that inline conditionals, comprehensions and quoted keywords raise no behavior risks."""
+        change = CodeChange(
+            file_path="services/notifier.py",
+            change_type="modify",
+            diff="""--- a/services/notifier.py
++++ b/services/notifier.py
+@@ -1,3 +1,4 @@
+-    status = 'active' if user.enabled else 'disabled'
+-    note = 'return to sender'
++    status = 'active' if user.verified else 'disabled'
++    note = 'return later'  # do not return early
++    ids = [u.id for u in users if u.enabled]
+""",
+            line_changes={"added": 3, "removed": 2},
+            semantic_changes=["Adjusted notification fields"]
+        )
+        
+        risks = detector.analyze_changes([change], {})
+        
+        descriptions = {r.description for r in risks}
+        assert "Control flow logic modified" not in descriptions
+        assert "Return values modified" not in descriptions
+        assert "Additional loops added, potential performance impact" not in descriptions
+    
+    def test_async_and_compound_statements_count(self, detector):
+        """Test that `async for` loops and one-line `if x: return y` statements are detected."""
+        change = CodeChange(
+            file_path="services/rows.py",
+            change_type="modify",
+            diff="""--- a/services/rows.py
++++ b/services/rows.py
+@@ -1,3 +1,4 @@
+-    if row is None: return None
+-    else: return row
++    async for row in cursor:
++        if row is None: return []
++        else: return [row]
+""",
+            line_changes={"added": 3, "removed": 2},
+            semantic_changes=["Read rows asynchronously"]
+        )
         
+        risks = detector.analyze_changes([change], {})
+        
+        descriptions = {r.description for r in risks}
+        assert "Additional loops added, potential performance impact" in descriptions
+        assert "Return values modified" in descriptions
+        assert "Control flow logic modified" in descriptions
+    
+    def test_detect_return_statement_change(self, detector):
+        """Test that changed return statements raise a behavior risk."""
+        change = CodeChange(
+            file_path="services/pricing.py",
+            change_type="modify",
+            diff="""--- a/services/pricing.py
++++ b/services/pricing.py
+@@ -1,2 +1,2 @@
+ def price(item):
+-    return item.base
++    return item.base * 1.2
+""",
+            line_changes={"added": 1, "removed": 1},
+            semantic_changes=["Added markup"]
+        )
+        
+        risks = detector.analyze_changes([change], {})
+        
+        assert any(r.description == "Return values modified" for r in risks)
+    
+    def test_generate_regression_report(self, detector, api_change_risks):
+        """Test regression report generation."""
         step = RefactorStep(
             id="test-step",
             type=RefactorType.API_VERSIONING,
@@ -141,7 +299,7 @@ class TestRegressionDetector:
             risk_level="medium"
         )
         
-        report = detector.generate_regression_report(risks, step)
+        report = detector.generate_regression_report(api_change_risks, step)
         
         assert "Regression Analysis Report" in report
         assert "Add API versioning" in report
@@ -183,4 +341,213 @@ class TestRegressionDetector:
         
         # Security risk should be prioritized first
         assert risks[0].type == "security"
-        assert risks[0].severity == "critical"
\ No newline at end of file
+        assert risks[0].severity == "critical"
+    
+    def test_priority_follows_severity_updates(self, detector):
+        """Test that reassigned or copied-over severities re-rank a risk."""
+        downgraded = RegressionRisk(
+            type="api_change",
+            severity="critical",
+            description="API endpoint removed",
+            affected_components=["api/users.py"]
+        )
+        other = RegressionRisk(
+            type="behavior_change",
+            severity="medium",
+            description="Exception handling modified",
+            affected_components=["services/user_service.py"]
+        )
+        
+        downgraded.severity = "low"
+        upgraded = other.model_copy(update={"severity": "critical"})
+        
+        ranked = sorted([downgraded, other, upgraded], key=detector._risk_priority, reverse=True)
+        assert ranked == [upgraded, other, downgraded]
+    
+    def test_repeated_analysis_uses_cache(self, behavior_change):
+        """Test that unchanged diffs are not re-analyzed."""
+        detector = RegressionDetector()
+        first = detector.analyze_changes([behavior_change], {})
+        second = detector.analyze_changes([behavior_change], {})
+        
+        assert len(detector._risk_cache) == 1
+        assert second == first
+    
+    def test_cached_risks_are_not_shared(self, behavior_change):
+        """Test that changing a returned risk does not alter later results."""
+        detector = RegressionDetector()
+        first = detector.analyze_changes([behavior_change], {})
+        first[0].affected_components.append("leaked")
+        first[0].severity = "low"
+        
+        second = detector.analyze_changes([behavior_change], {})
+        
+        assert all("leaked" not in r.affected_components for r in second)
+        assert second[0].severity != "low"
+    
+    def test_risk_cache_is_bounded(self, api_change, behavior_change):
+        """Test that the risk cache evicts the least recently used change."""
+        detector = RegressionDetector(cache_size=1)
+        
+        detector.analyze_changes([api_change], {})
+        risks = detector.analyze_changes([behavior_change], {})
+        
+        assert len(detector._risk_cache) == 1
+        assert detector.analyze_changes([behavior_change], {}) == risks
+    
+    def test_cache_distinguishes_supplied_lines(self):
+        """Test that changes differing only in supplied lines are analyzed separately."""
+        detector = RegressionDetector()
+        
+        def make_change(added_line):
+            return CodeChange(
+                file_path="config/settings.py",
+                change_type="modify",
+                diff="<diff omitted>",
+                line_changes={"added": 1, "removed": 0},
+                semantic_changes=["Updated settings"],
+                added_lines=[added_line]
+            )
+        
+        detector.analyze_changes([make_change("    return 1")], {})
+        risks = detector.analyze_changes([make_change('password = "x"')], {})
+        
+        assert any(r.description == "Hardcoded secrets detected" for r in risks)
+    
+    def test_detect_multiline_parameter_changes(self, detector):
+        """Test parameter changes are found from full file contents."""
+        change = CodeChange(
+            file_path="services/billing.py",
+            change_type="modify",
+            diff="""--- a/services/billing.py
++++ b/services/billing.py
+@@ -1,4 +1,4 @@
+ def charge(
+-    customer_id,
++    account_id,
+     amount,
+ ):
+""",
+            line_changes={"added": 1, "removed": 1},
+            semantic_changes=["Renamed charge parameter"],
+            old_content="def charge(\n    customer_id,\n    amount,\n):\n    pass\n",
+            new_content="def charge(\n    account_id,\n    amount,\n):\n    pass\n"
+        )
+        
+        risks = detector.analyze_changes([change], {})
+        
+        param_risks = [r for r in risks if "parameters changed" in r.description]
+        assert len(param_risks) == 1
+        assert param_risks[0].severity == "high"
+        assert "charge" in param_risks[0].description
+    
+    def test_detect_reordered_parameters(self, detector):
+        """Test that swapping parameter order is reported as a breaking change."""
+        change = CodeChange(
+            file_path="services/billing.py",
+            change_type="modify",
+            diff="""--- a/services/billing.py
++++ b/services/billing.py
+@@ -1,2 +1,2 @@
+-def refund(amount, customer_id):
++def refund(customer_id, amount):
+     pass
+""",
+            line_changes={"added": 1, "removed": 1},
+            semantic_changes=["Reordered refund parameters"]
+        )
+    
+        risks = detector.analyze_changes([change], {})
+    
+        param_risks = [r for r in risks if "parameters changed" in r.description]
+        assert len(param_risks) == 1
+        assert param_risks[0].severity == "high"
+    
+    def test_same_method_name_in_new_class_is_not_a_change(self, detector):
+        """Test that methods are compared by qualified name, not bare name."""
+        old_content = "class A:\n    def __init__(self, a, b):\n        pass\n"
+        new_content = old_content + "\n\nclass B:\n    def __init__(self, x):\n        pass\n"
+        change = CodeChange(
+            file_path="services/models.py",
+            change_type="modify",
+            diff="""--- a/services/models.py
++++ b/services/models.py
+@@ -3,0 +4,4 @@
++
++class B:
++    def __init__(self, x):
++        pass
+""",
+            line_changes={"added": 4, "removed": 0},
+            semantic_changes=["Added class B"],
+            old_content=old_content,
+            new_content=new_content
+        )
+        
+        risks = detector.analyze_changes([change], {})
+        
+        assert not [r for r in risks if "parameters changed" in r.description]
+    
+    def test_detect_default_value_change_from_contents(self, detector):
+        """Test that a changed default is reported when full contents are supplied."""
+        change = CodeChange(
+            file_path="services/billing.py",
+            change_type="modify",
+            diff="""--- a/services/billing.py
++++ b/services/billing.py
+@@ -1,2 +1,2 @@
+-def f(a, b=1):
++def f(a, b=2):
+     pass
+""",
+            line_changes={"added": 1, "removed": 1},
+            semantic_changes=["Changed default of b"],
+            old_content="def f(a, b=1):\n    pass\n",
+            new_content="def f(a, b=2):\n    pass\n"
+        )
+        
+        risks = detector.analyze_changes([change], {})
+        
+        param_risks = [r for r in risks if "parameters changed" in r.description]
+        assert len(param_risks) == 1
+        assert "f" in param_risks[0].description
+    
+    def test_signature_cache_is_bounded(self):
+        """Test that only the most recent file versions keep cached signatures."""
+        detector = RegressionDetector(cache_size=2)
+        
+        for version in range(3):
+            detector._function_params_from_source(f"def f(a, b={version}):\n    pass\n")
+        
+        assert len(detector._signature_cache) == 2
+        assert detector._function_params_from_source("def f(a, b=2):\n    pass\n") == {"f": ["a", "b=2"]}
+        assert detector._function_params_from_source("def f(:\n") is None
+    
+    def test_parallel_analysis_matches_serial(self, api_change, behavior_change):
+        """Test that pooled analysis yields the same risks as serial analysis."""
+        changes = [api_change, behavior_change]
+        
+        serial = RegressionDetector().analyze_changes(changes, {})
+        parallel = RegressionDetector(max_workers=2, parallel_threshold=0).analyze_changes(changes, {})
+        
+        assert [(r.type, r.severity, r.description) for r in parallel] == \
+            [(r.type, r.severity, r.description) for r in serial]
+    
+    def test_parallel_analysis_uses_subclass_overrides(self, api_change, behavior_change):
+        """Test that pool workers run the same detector class as the caller."""
+        changes = [api_change, behavior_change]
+        
+        parallel = _LabelingDetector(max_workers=2, parallel_threshold=0).analyze_changes(changes, {})
+        
+        assert parallel
+        assert all(r.mitigation == "labeled" for r in parallel)
+    
+    def test_top_k_returns_highest_priority_risks(self, detector, api_change, behavior_change):
+        """Test that top_k keeps the head of the full priority ordering."""
+        changes = [api_change, behavior_change]
+        
+        all_risks = detector.analyze_changes(changes, {})
+        top_risks = detector.analyze_changes(changes, {}, top_k=1)
+        
+        assert len(all_risks) > 1
+        assert top_risks == all_risks[:1]